@@ -1,16 +1,88 @@
 import ast
+import contextvars
+import cProfile
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
+import gzip
+import hashlib
+import hmac
+import io
 import json
+import math
 import os
+import pstats
+import random
 import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
 import traceback
+import uuid
+import zlib
 
-from flask import Flask, jsonify, request
+from flask import Flask, g, has_request_context, request, stream_with_context
 
+import numpy as np
 import requests
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
 CACHE_FILE = '/tmp/cache.txt'
 CACHE_EXPIRY = timedelta(days=1)
+CACHE_LOCK = threading.RLock()
+
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+CACHE_REDIS_PREFIX = os.environ.get('CACHE_REDIS_PREFIX', 'stockcrawler')
+CACHE_REDIS_RETRY_INTERVAL = timedelta(seconds=30)
+CACHE_REDIS_ALLOW_FLUSH = os.environ.get('CACHE_REDIS_ALLOW_FLUSH', '0').lower() in { '1', 't', 'true', 'y', 'yes' }
+CACHE_REDIS_TIMEOUT = float(os.environ.get('CACHE_REDIS_TIMEOUT', '0.25'))
+REMOTE_CACHE = { 'client': None, 'should_replay_local_cache': False, 'unavailable_until': None }
+
+FIELD_CACHE_EXPIRY = {
+    'dy': timedelta(hours=6),
+    'liquidity': timedelta(hours=1),
+    'market_value': timedelta(hours=1),
+    'max_52_weeks': timedelta(hours=1),
+    'min_52_weeks': timedelta(hours=1),
+    'pl': timedelta(hours=1),
+    'price': timedelta(minutes=15),
+    'pvp': timedelta(hours=1),
+    'variation_12m': timedelta(hours=1),
+    'variation_30d': timedelta(hours=1)
+}
+
+HTTP_STALE_WHILE_REVALIDATE = timedelta(hours=1)
+
+COMPRESSION_MIN_SIZE = 1_024
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+VARY_HEADER = 'Accept, Accept-Encoding'
+
+MAX_TICKERS_PER_REQUEST = int(os.environ.get('MAX_TICKERS_PER_REQUEST', '20'))
+TICKER_PATTERN = re.compile(r'^[A-Z0-9][A-Z0-9.-]{0,11}$')
 
 DATE_FORMAT = '%d-%m-%Y %H:%M:%S'
 
@@ -19,8 +91,54 @@ ERROR_LOG_LEVEL = 'ERROR'
 INFO_LOG_LEVEL = 'INFO'
 LOG_LEVEL = os.environ.get('LOG_LEVEL', ERROR_LOG_LEVEL)
 
+PROFILING_DIR = '/tmp/profiles'
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0').lower() in { '1', 't', 'true', 'y', 'yes' }
+PROFILING_MAX_FILES = int(os.environ.get('PROFILING_MAX_FILES', '100'))
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_TOP_FUNCTIONS = int(os.environ.get('PROFILING_TOP_FUNCTIONS', '25'))
+
+REQUEST_TIMEOUT = float(os.environ.get('REQUEST_TIMEOUT', '30'))
+
+LATE_FETCH_MAX_THREADS = int(os.environ.get('LATE_FETCH_MAX_THREADS', '64'))
+LATE_FETCH_SLOTS = threading.BoundedSemaphore(LATE_FETCH_MAX_THREADS)
+
+MISSING_NUMBER = contextvars.ContextVar('missing_number', default=0)
+
 SEPARATOR = '#@#'
 
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', '/tmp/snapshot')
+SNAPSHOTS = {}
+SNAPSHOT_LOCK = threading.Lock()
+SNAPSHOT_RETENTION = timedelta(minutes=1)
+SNAPSHOT_CRAWL_TOKEN = os.environ.get('SNAPSHOT_CRAWL_TOKEN')
+SNAPSHOT_CRAWL_MAX_TICKERS = int(os.environ.get('SNAPSHOT_CRAWL_MAX_TICKERS', '100'))
+SNAPSHOT_CRAWL_WORKERS = int(os.environ.get('SNAPSHOT_CRAWL_WORKERS', '8'))
+
+SCREEN_FILTER_SEPARATOR = ';'
+SCREEN_FILTER_PATTERN = re.compile(r'^([a-z0-9_]+)(>=|<=|!=|>|<|=)(.+)$')
+
+SCREEN_OPERATORS = {
+    '>=': lambda column, value: column >= value,
+    '<=': lambda column, value: column <= value,
+    '!=': lambda column, value: column != value,
+    '>': lambda column, value: column > value,
+    '<': lambda column, value: column < value,
+    '=': lambda column, value: column == value
+}
+
+NON_SCALAR_INFOS = {
+    'latests_dividends'
+}
+
+TEXT_INFOS = {
+    'actuation',
+    'initial_date',
+    'link',
+    'name',
+    'sector',
+    'type'
+}
+
 VALID_SOURCES = {
     'ALL_SOURCE': 'all',
     'INVESTIDOR10_SOURCE': 'investidor10',
@@ -67,8 +185,9 @@ VALID_INFOS = [
     'variation_30d'
 ]
 
+SNAPSHOT_INFOS = [ info for info in VALID_INFOS if info not in NON_SCALAR_INFOS ]
+
 app = Flask(__name__)
-app.json.sort_keys = False
 
 def log_error(message):
     if LOG_LEVEL == ERROR_LOG_LEVEL or LOG_LEVEL == INFO_LOG_LEVEL or LOG_LEVEL == DEBUG_LOG_LEVEL:
@@ -89,89 +208,251 @@ def cache_exists():
     log_info('No cache file found')
     return False
 
-def upsert_cache(id, data):
-    lines = []
-    updated = False
+def get_field_expiry(info):
+    return FIELD_CACHE_EXPIRY.get(info, CACHE_EXPIRY)
+
+def parse_cache_line(line):
+    id, cached_date_as_text, data_as_text, *field_dates_as_text = line.strip().split(SEPARATOR)
+    data = ast.literal_eval(data_as_text)
+
+    field_dates = ast.literal_eval(field_dates_as_text[0]) if field_dates_as_text else { info: cached_date_as_text for info in data }
+
+    return id, data, field_dates
+
+def get_field_expiries(field_dates):
+    now = datetime.now()
+    return { info: get_field_expiry(info) - (now - datetime.strptime(field_date_as_text, DATE_FORMAT)) for info, field_date_as_text in field_dates.items() }
+
+def upsert_local_cache(id, data):
+    with CACHE_LOCK:
+        lines = []
+        updated = False
+
+        if cache_exists():
+            with open(CACHE_FILE, 'r') as cache_file:
+                lines = cache_file.readlines()
+
+        now_as_text = datetime.now().strftime(DATE_FORMAT)
+        new_field_dates = { info: now_as_text for info in data }
+
+        with open(CACHE_FILE, 'w') as cache_file:
+            for line in lines:
+                if not line.startswith(f'{id}{SEPARATOR}'):
+                    cache_file.write(line)
+                    continue
+
+                _, old_data, old_field_dates = parse_cache_line(line)
+
+                combined_data = { **old_data, **data }
+                combined_field_dates = { **old_field_dates, **new_field_dates }
+                updated_line = f'{id}{SEPARATOR}{now_as_text}{SEPARATOR}{combined_data}{SEPARATOR}{combined_field_dates}\n'
+                cache_file.write(updated_line)
+                updated = True
+
+            if not updated:
+                new_line = f'{id}{SEPARATOR}{now_as_text}{SEPARATOR}{data}{SEPARATOR}{new_field_dates}\n'
+                cache_file.write(new_line)
+                log_info(f'New cache entry created for "{id}"')
+
+        if updated:
+            log_info(f'Cache updated for "{id}"')
+
+def clear_local_cache(id):
+    with CACHE_LOCK:
+        if not cache_exists():
+            return
+
+        log_debug('Cleaning cache')
 
-    if cache_exists():
         with open(CACHE_FILE, 'r') as cache_file:
             lines = cache_file.readlines()
 
-    with open(CACHE_FILE, 'w') as cache_file:
-        for line in lines:
-            if not line.startswith(id):
-                cache_file.write(line)
-                continue
+        with open(CACHE_FILE, 'w') as cache_file:
+            cache_file.writelines(line for line in lines if not line.startswith(f'{id}{SEPARATOR}'))
 
-            _, old_cached_date_as_text, old_data_as_text = line.strip().split(SEPARATOR)
-            old_data = ast.literal_eval(old_data_as_text)
+        log_info(f'Cache cleaning completed for "{id}"')
 
-            combined_data = { **old_data, **data }
-            updated_line = f'{id}{SEPARATOR}{old_cached_date_as_text}{SEPARATOR}{combined_data}\n'
-            cache_file.write(updated_line)
-            updated = True
+def read_local_cache_entry(id):
+    with CACHE_LOCK:
+        if not cache_exists():
+            return None, None
 
-        if not updated:
-            new_line = f'{id}{SEPARATOR}{datetime.now().strftime(DATE_FORMAT)}{SEPARATOR}{data}\n'
-            cache_file.write(new_line)
-            log_info(f'New cache entry created for "{id}"')
+        with open(CACHE_FILE, 'r') as cache_file:
+            for line in cache_file:
+                if line.startswith(f'{id}{SEPARATOR}'):
+                    _, data, field_dates = parse_cache_line(line)
+                    return data, field_dates
 
-    if updated:
-        log_info(f'Cache updated for "{id}"')
+        return None, None
 
-def clear_cache(id):
-    if not cache_exists():
-        return
+def read_local_cache_entries():
+    with CACHE_LOCK:
+        if not cache_exists():
+            return []
 
-    log_debug('Cleaning cache')
+        with open(CACHE_FILE, 'r') as cache_file:
+            return [ parse_cache_line(line) for line in cache_file if line.strip() ]
 
-    with open(CACHE_FILE, 'r') as cache_file:
-        lines = cache_file.readlines()
+def read_local_cache(id):
+    with CACHE_LOCK:
+        log_debug('Reading cache')
 
-    with open(CACHE_FILE, 'w') as cache_file:
-        cache_file.writelines(line for line in lines if not line.startswith(id))
+        data, field_dates = read_local_cache_entry(id)
+        if data is None:
+            log_info(f'No cache entry found for "{id}"')
+            return None
 
-    log_info(f'Cache cleaning completed for "{id}"')
+        field_expiries = get_field_expiries(field_dates)
+        fresh_data = { info: value for info, value in data.items() if field_expiries.get(info, timedelta(0)) > timedelta(0) }
+
+        if fresh_data:
+            log_debug(f'Cache hit for "{id}" ({len(fresh_data)} of {len(data)} fields fresh)')
+            return fresh_data
+
+        log_debug(f'Cache expired for "{id}"')
+        clear_local_cache(id)
 
-def read_cache(id):
-    if not cache_exists():
         return None
 
-    log_debug('Reading cache')
+def read_local_cache_expiries(id):
+    _, field_dates = read_local_cache_entry(id)
+    return get_field_expiries(field_dates) if field_dates else {}
 
-    clear_cache_control = False
+def delete_local_cache():
+    with CACHE_LOCK:
+        if not cache_exists():
+            return
 
-    with open(CACHE_FILE, 'r') as cache_file:
-        for line in cache_file:
-            if not line.startswith(id):
-                continue
+        log_debug('Deleting cache')
 
-            _, cached_date_as_text, data = line.strip().split(SEPARATOR)
-            cached_date = datetime.strptime(cached_date_as_text, DATE_FORMAT)
+        os.remove(CACHE_FILE)
 
-            if datetime.now() - cached_date <= CACHE_EXPIRY:
-                log_debug(f'Cache hit for "{id}" (Date: {cached_date_as_text})')
-                return ast.literal_eval(data)
+        log_info('Cache deletion completed')
 
-            log_debug(f'Cache expired for "{id}" (Date: {cached_date_as_text})')
-            clear_cache_control = True
-            break
+def read_local_caches(ids):
+    return { id: read_local_cache(id) for id in ids }
 
-    if clear_cache_control:
-        clear_cache(id)
+def get_remote_cache():
+    if not CACHE_REDIS_URL or not redis:
+        return None
 
-    log_info(f'No cache entry found for "{id}"')
-    return None
+    unavailable_until = REMOTE_CACHE['unavailable_until']
+    if unavailable_until and datetime.now() < unavailable_until:
+        return None
 
-def delete_cache():
-    if not cache_exists():
-        return
+    if not REMOTE_CACHE['client']:
+        REMOTE_CACHE['client'] = redis.Redis.from_url(CACHE_REDIS_URL, socket_timeout=CACHE_REDIS_TIMEOUT, socket_connect_timeout=CACHE_REDIS_TIMEOUT)
+
+    return REMOTE_CACHE['client']
+
+def get_remote_cache_key(id, info):
+    return f'{CACHE_REDIS_PREFIX}:{id}:{info}'
+
+def upsert_remote_cache(remote_cache, id, data):
+    pipeline = remote_cache.pipeline(transaction=False)
+
+    for info, value in data.items():
+        pipeline.set(get_remote_cache_key(id, info), repr(value), ex=get_field_expiry(info))
+
+    pipeline.execute()
+
+    log_info(f'Remote cache updated for "{id}"')
+
+def clear_remote_cache(remote_cache, id):
+    log_debug('Cleaning remote cache')
+
+    remote_cache.delete(*[ get_remote_cache_key(id, info) for info in VALID_INFOS ])
+
+    log_info(f'Remote cache cleaning completed for "{id}"')
+
+def read_remote_caches(remote_cache, ids):
+    log_debug(f'Reading remote cache for {len(ids)} ids')
+
+    pipeline = remote_cache.pipeline(transaction=False)
+    for id in ids:
+        pipeline.mget([ get_remote_cache_key(id, info) for info in VALID_INFOS ])
+
+    cached_data_by_id = {}
+    for id, values in zip(ids, pipeline.execute()):
+        cached_data = { info: ast.literal_eval(value.decode()) for info, value in zip(VALID_INFOS, values) if value is not None }
+        log_debug(f'Remote cache {"hit" if cached_data else "miss"} for "{id}"')
+        cached_data_by_id[id] = cached_data or None
+
+    return cached_data_by_id
+
+def read_remote_cache(remote_cache, id):
+    return read_remote_caches(remote_cache, [ id ])[id]
+
+def read_remote_cache_expiries(remote_cache, id):
+    pipeline = remote_cache.pipeline(transaction=False)
+    for info in VALID_INFOS:
+        pipeline.pttl(get_remote_cache_key(id, info))
+
+    return { info: timedelta(milliseconds=ttl) for info, ttl in zip(VALID_INFOS, pipeline.execute()) if ttl > 0 }
+
+def delete_remote_cache(remote_cache):
+    log_debug('Deleting remote cache')
+
+    keys = list(remote_cache.scan_iter(match=f'{CACHE_REDIS_PREFIX}:*', count=1_000))
+    if keys:
+        remote_cache.unlink(*keys)
+
+    log_info('Remote cache deletion completed')
+
+def replay_local_cache(remote_cache):
+    with CACHE_LOCK:
+        if not REMOTE_CACHE['should_replay_local_cache']:
+            return
+
+        entries = read_local_cache_entries()
+
+        pipeline = remote_cache.pipeline(transaction=False)
+        for id, data, field_dates in entries:
+            for info, expiry in get_field_expiries(field_dates).items():
+                if info in data and expiry > timedelta(seconds=1):
+                    pipeline.set(get_remote_cache_key(id, info), repr(data[info]), ex=expiry, nx=True)
+
+        pipeline.execute()
+
+        delete_local_cache()
+        REMOTE_CACHE['should_replay_local_cache'] = False
+
+    log_info(f'Local cache written during remote outage replayed for {len(entries)} ids')
+
+def call_cache(remote_function, local_function, *args):
+    remote_cache = get_remote_cache()
+
+    if remote_cache:
+        try:
+            replay_local_cache(remote_cache)
+            return remote_function(remote_cache, *args)
+        except (redis.RedisError, OSError):
+            log_error(f'Remote cache unavailable, falling back to local cache: {traceback.format_exc()}')
+            REMOTE_CACHE['unavailable_until'] = datetime.now() + CACHE_REDIS_RETRY_INTERVAL
+            REMOTE_CACHE['should_replay_local_cache'] = True
+
+    return local_function(*args)
 
-    log_debug('Deleting cache')
+def upsert_cache(id, data):
+    return call_cache(upsert_remote_cache, upsert_local_cache, id, data)
+
+def clear_cache(id):
+    return call_cache(clear_remote_cache, clear_local_cache, id)
 
-    os.remove(CACHE_FILE)
+def read_cache(id):
+    return call_cache(read_remote_cache, read_local_cache, id)
+
+def read_caches(ids):
+    return call_cache(read_remote_caches, read_local_caches, ids)
 
-    log_info('Cache deletion completed')
+def read_cache_expiries(id):
+    return call_cache(read_remote_cache_expiries, read_local_cache_expiries, id)
+
+def delete_cache():
+    if not CACHE_REDIS_ALLOW_FLUSH:
+        return delete_local_cache()
+
+    return call_cache(delete_remote_cache, delete_local_cache)
 
 def preprocess_cache(id, should_delete_all_cache, should_clear_cached_data, should_use_cache):
     if should_delete_all_cache:
@@ -203,9 +484,9 @@ def get_substring(text, start_text, end_text, replace_by_paterns=[], should_remo
 
     return final_text.strip()
 
-def text_to_number(text, should_convert_thousand_decimal_separators=False, convert_percent_to_decimal=False):
+def text_to_number(text, should_convert_thousand_decimal_separators=False, convert_percent_to_decimal=False, default=None):
     try:
-        if not text:
+        if text is None or text == '':
             raise Exception()
 
         if not isinstance(text, str):
@@ -233,7 +514,20 @@ def text_to_number(text, should_convert_thousand_decimal_separators=False, conve
 
         return float(text.strip())
     except:
-        return 0
+        return MISSING_NUMBER.get() if default is None else default
+
+def convert_infos(all_info, info_names):
+    if MISSING_NUMBER.get() is not None:
+        return { info: all_info[info]() for info in info_names }
+
+    final_data = {}
+    for info in info_names:
+        try:
+            final_data[info] = all_info[info]()
+        except (TypeError, ZeroDivisionError):
+            final_data[info] = None
+
+    return final_data
 
 def multiply_by_unit(data):
     if not data:
@@ -251,7 +545,7 @@ def multiply_by_unit(data):
     return text_to_number(data)
 
 def request_get(url, headers=None):
-    response = requests.get(url, headers=headers)
+    response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
 
     log_debug(f'Response from {url} : {response}')
@@ -342,9 +636,7 @@ def convert_investidor10_stock_or_reit_data(json_ticker_page, json_dividends_dat
         'variation_30d': lambda: None
     }
 
-    final_data = { info: ALL_INFO[info]() for info in info_names }
-
-    return final_data
+    return convert_infos(ALL_INFO, info_names)
 
 def get_stock_or_reit_from_investidor10(ticker, share_type, info_names):
     try:
@@ -424,9 +716,7 @@ def convert_stockanalysis_stock_or_reit_data(ticker, share_type, initial_page, s
         'variation_30d': lambda: None,
     }
 
-    final_data = { info: ALL_INFO[info]() for info in info_names }
-
-    return final_data
+    return convert_infos(ALL_INFO, info_names)
 
 def get_stock_or_reit_from_stockanalysis(ticker, share_type, info_names):
     try:
@@ -454,10 +744,13 @@ def get_stock_or_reit_from_stockanalysis(ticker, share_type, info_names):
         log_error(f'Error fetching data from Stock Analysis for "{ticker}": {traceback.format_exc()}')
         return None
 
-def get_stock_or_reit_from_all_sources(ticker, share_type, info_names):
+def get_stock_or_reit_from_all_sources(ticker, share_type, info_names, partial_data=None):
     data_stockanalysis = get_stock_or_reit_from_stockanalysis(ticker, share_type, info_names)
     log_info(f'Data from Stock Analysis: {data_stockanalysis}')
 
+    if partial_data is not None and data_stockanalysis:
+        partial_data.update(data_stockanalysis)
+
     missing_stockanalysis_infos = filter_remaining_infos(data_stockanalysis, info_names)
     log_debug(f'Missing info from Stock Analysis: {missing_stockanalysis_infos}')
 
@@ -472,13 +765,13 @@ def get_stock_or_reit_from_all_sources(ticker, share_type, info_names):
 
     return { **data_stockanalysis, **data_investidor_10 }
 
-def get_stock_or_reit_from_sources(ticker, share_type, source, info_names):
+def get_stock_or_reit_from_sources(ticker, share_type, source, info_names, partial_data=None):
     SOURCES = {
         VALID_SOURCES['STOCKANALYSIS_SOURCE']: get_stock_or_reit_from_stockanalysis,
         VALID_SOURCES['INVESTIDOR10_SOURCE']: get_stock_or_reit_from_investidor10
     }
 
-    fetch_function = SOURCES.get(source, get_stock_or_reit_from_all_sources)
+    fetch_function = SOURCES.get(source, lambda ticker, share_type, info_names: get_stock_or_reit_from_all_sources(ticker, share_type, info_names, partial_data))
     return fetch_function(ticker, share_type, info_names)
 
 def convert_investidor10_etf_data(html_page, json_dividends_data, info_names):
@@ -534,9 +827,7 @@ def convert_investidor10_etf_data(html_page, json_dividends_data, info_names):
         'variation_30d': lambda: None
     }
 
-    final_data = { info: ALL_INFO[info]() for info in info_names }
-
-    return final_data
+    return convert_infos(ALL_INFO, info_names)
 
 def get_etf_from_investidor10(ticker, info_names):
     try:
@@ -632,9 +923,7 @@ def convert_stockanalysis_etf_data(html_page, json_quote_data, info_names):
         'variation_30d': lambda: None
     }
 
-    final_data = { info: ALL_INFO[info]() for info in info_names }
-
-    return final_data
+    return convert_infos(ALL_INFO, info_names)
 
 def get_etf_from_stockanalysis(ticker, info_names):
     try:
@@ -660,10 +949,13 @@ def get_etf_from_stockanalysis(ticker, info_names):
         log_error(f'Error fetching data from Stock Analysis for "{ticker}": {traceback.format_exc()}')
         return None
 
-def get_etf_from_all_sources(ticker, info_names):
+def get_etf_from_all_sources(ticker, info_names, partial_data=None):
     data_stockanalysis = get_etf_from_stockanalysis(ticker, info_names)
     log_info(f'Data from Stock Analysis: {data_stockanalysis}')
 
+    if partial_data is not None and data_stockanalysis:
+        partial_data.update(data_stockanalysis)
+
     missing_stockanalysis_infos = filter_remaining_infos(data_stockanalysis, info_names)
     log_debug(f'Missing info from Stock Analysis: {missing_stockanalysis_infos}')
 
@@ -678,51 +970,135 @@ def get_etf_from_all_sources(ticker, info_names):
 
     return { **data_stockanalysis, **data_investidor_10 }
 
-def get_etf_from_sources(ticker, share_type, source, info_names):
+def get_etf_from_sources(ticker, share_type, source, info_names, partial_data=None):
     SOURCES = {
         VALID_SOURCES['STOCKANALYSIS_SOURCE']: get_etf_from_stockanalysis,
         VALID_SOURCES['INVESTIDOR10_SOURCE']: get_etf_from_investidor10
     }
 
-    fetch_function = SOURCES.get(source, get_etf_from_all_sources)
+    fetch_function = SOURCES.get(source, lambda ticker, info_names: get_etf_from_all_sources(ticker, info_names, partial_data))
     return fetch_function(ticker, info_names)
 
-def get_data_from_cache(ticker, info_names, can_use_cache):
+def get_data_from_cache(ticker, info_names, can_use_cache, get_cached_data=read_cache):
     if not can_use_cache:
         return None
 
-    cached_data = read_cache(ticker)
+    cached_data = get_cached_data(ticker)
     if not cached_data:
         return None
 
-    filtered_data = { key: cached_data[key] for key in info_names if key in cached_data }
+    filtered_data = { key: cached_data.get(key) for key in info_names }
     log_info(f'Data from Cache: {filtered_data}')
 
     return filtered_data
 
-def get_data(ticker, share_type, source, info_names, can_use_cache, get_data_from_sources):
-    cached_data = get_data_from_cache(ticker, info_names, can_use_cache)
-
-    SHOULD_UPDATE_CACHE = True
-
+def get_data(ticker, share_type, source, info_names, can_use_cache, cached_data, get_data_from_sources, partial_data=None):
     if not can_use_cache:
-        return not SHOULD_UPDATE_CACHE, get_data_from_sources(ticker, share_type, source, info_names)
+        return None, get_data_from_sources(ticker, share_type, source, info_names, partial_data)
 
     missing_cache_info_names = filter_remaining_infos(cached_data, info_names)
 
     if not missing_cache_info_names:
-        return not SHOULD_UPDATE_CACHE, cached_data
+        return None, cached_data
 
-    source_data = get_data_from_sources(ticker, share_type, source, missing_cache_info_names)
+    source_data = get_data_from_sources(ticker, share_type, source, missing_cache_info_names, partial_data)
 
     if cached_data and source_data:
-        return SHOULD_UPDATE_CACHE, { **cached_data, **source_data }
+        return source_data, { **cached_data, **source_data }
     elif cached_data and not source_data:
-        return not SHOULD_UPDATE_CACHE, cached_data
+        return None, cached_data
     elif not cached_data and source_data:
-        return SHOULD_UPDATE_CACHE, source_data
+        return source_data, source_data
+
+    return None, None
+
+def get_etag(ticker, data, mimetype):
+    return hashlib.sha1(f'{ticker}{SEPARATOR}{mimetype}{SEPARATOR}{data}'.encode()).hexdigest()
+
+def get_cache_control(ticker, info_names, can_use_cache):
+    if not can_use_cache:
+        return 'no-store'
+
+    field_expiries = read_cache_expiries(ticker)
+
+    fields_expiry = min(field_expiries.get(info, get_field_expiry(info)) for info in info_names)
+    max_age = int(max(fields_expiry, timedelta(0)).total_seconds())
+    stale_while_revalidate = int(HTTP_STALE_WHILE_REVALIDATE.total_seconds())
+
+    return f'public, max-age={max_age}, s-maxage={max_age}, stale-while-revalidate={stale_while_revalidate}'
+
+def get_response_mimetype(extra_mimetypes=None):
+    offered_mimetypes = [ JSON_MIMETYPE, *([ MSGPACK_MIMETYPE ] if msgpack else []), *(extra_mimetypes or []) ]
+    return request.accept_mimetypes.best_match(offered_mimetypes, default=JSON_MIMETYPE)
+
+def get_response_encoding():
+    offered_encodings = [ *([ 'br' ] if brotli else []), 'gzip' ]
+    return request.accept_encodings.best_match(offered_encodings)
+
+def encode_json(data):
+    if orjson:
+        return orjson.dumps(data)
+
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+def encode_body(data, mimetype):
+    if mimetype == MSGPACK_MIMETYPE:
+        return msgpack.packb(data)
+
+    return encode_json(data)
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+
+    return gzip.compress(body, compresslevel=6)
+
+def make_data_response(data, status, headers=None):
+    mimetype = get_response_mimetype()
+    body = encode_body(data, mimetype)
 
-    return not SHOULD_UPDATE_CACHE, None
+    response_headers = { **(headers or {}), 'Content-Type': mimetype, 'Vary': VARY_HEADER }
+
+    encoding = get_response_encoding()
+    if encoding and len(body) >= COMPRESSION_MIN_SIZE:
+        body = compress_body(body, encoding)
+        response_headers['Content-Encoding'] = encoding
+
+    log_debug(f'Response encoded as {mimetype} ({encoding or "identity"}) with {len(body)} bytes')
+
+    return app.response_class(body, status=status, headers=response_headers)
+
+def stream_ndjson_response(tickers, get_data_by_ticker):
+    encoding = get_response_encoding()
+
+    def generate_lines():
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=5)
+            compress = compressor.process
+            flush = compressor.flush
+            finish = compressor.finish
+        elif encoding == 'gzip':
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            compress = compressor.compress
+            flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            finish = compressor.flush
+        else:
+            compress = lambda line: line
+            flush = lambda: b''
+            finish = lambda: b''
+
+        for ticker in tickers:
+            _, data = get_data_by_ticker(ticker)
+            line = encode_json({ 'ticker': ticker, 'data': data } if data else { 'ticker': ticker, 'error': 'No data found' }) + b'\n'
+            yield compress(line) + flush()
+
+        yield finish()
+
+    headers = { 'Cache-Control': 'no-cache', 'Vary': VARY_HEADER }
+    if encoding:
+        headers['Content-Encoding'] = encoding
+
+    return app.response_class(stream_with_context(generate_lines()), status=200, mimetype=NDJSON_MIMETYPE, headers=headers)
 
 def get_parameter_info(params, name, default=None):
     return params.get(name, default).replace(' ', '').lower()
@@ -730,6 +1106,153 @@ def get_parameter_info(params, name, default=None):
 def get_cache_parameter_info(params, name, default='0'):
     return get_parameter_info(params, name, default) in { '1', 's', 'sim', 't', 'true', 'y', 'yes' }
 
+@app.before_request
+def start_profiling():
+    if not PROFILING_ENABLED:
+        return
+
+    is_summary = get_parameter_info(request.args, 'profile', '') == 'summary' or get_parameter_info(request.headers, 'X-Profile', '') == 'summary'
+    is_requested = is_summary or get_cache_parameter_info(request.args, 'profile') or get_cache_parameter_info(request.headers, 'X-Profile')
+    is_sampled = random.random() < PROFILING_SAMPLE_RATE
+
+    if not is_requested and not is_sampled:
+        return
+
+    profiler = cProfile.Profile()
+
+    try:
+        profiler.enable()
+    except ValueError:
+        log_debug(f'Another profiler is active, serving request {request.full_path} without profiling')
+        return
+
+    log_debug(f'Profiling request {request.full_path} (Summary: {is_summary} - Sampled: {not is_requested})')
+
+    g.is_profile_summary = is_summary
+    g.profiler = profiler
+    g.worker_profilers = []
+
+def profile_call(function):
+    worker_profilers = g.get('worker_profilers') if has_request_context() else None
+    if worker_profilers is None:
+        return function
+
+    def profiled_function(*args, **kwargs):
+        profiler = cProfile.Profile()
+
+        try:
+            profiler.enable()
+        except ValueError:
+            log_debug('Another profiler is active, running worker without profiling')
+            return function(*args, **kwargs)
+
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.disable()
+            worker_profilers.append(profiler)
+
+    return profiled_function
+
+def get_profile_stats(profiler, worker_profilers):
+    stats = pstats.Stats(profiler)
+    for worker_profiler in list(worker_profilers):
+        stats.add(worker_profiler)
+
+    return stats.sort_stats(pstats.SortKey.CUMULATIVE)
+
+def save_profile(stats, profile_file):
+    stats.dump_stats(profile_file)
+
+    old_profile_files = sorted(os.listdir(PROFILING_DIR))[:-PROFILING_MAX_FILES]
+    for old_profile_file in old_profile_files:
+        try:
+            os.remove(os.path.join(PROFILING_DIR, old_profile_file))
+        except OSError:
+            pass
+
+    log_info(f'Profile saved to "{profile_file}"')
+
+def get_profile_summary(stats, status):
+    top_functions = []
+    for function in stats.fcn_list[:PROFILING_TOP_FUNCTIONS]:
+        file_name, line_number, function_name = function
+        _, total_calls, total_time, cumulative_time, _ = stats.stats[function]
+        top_functions.append({
+            'function': f'{file_name}:{line_number}({function_name})',
+            'calls': total_calls,
+            'total_time': total_time,
+            'cumulative_time': cumulative_time
+        })
+
+    return { 'status': status, 'total_time': stats.total_tt, 'top_functions': top_functions }
+
+def profile_stream(chunks, profiler, on_finish):
+    iterator = iter(chunks)
+    is_profiling = True
+
+    try:
+        while True:
+            if is_profiling:
+                try:
+                    profiler.enable()
+                except ValueError:
+                    log_debug('Another profiler is active, streaming the rest of the response without profiling')
+                    is_profiling = False
+
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                if is_profiling:
+                    profiler.disable()
+
+            yield chunk
+    finally:
+        on_finish()
+
+@app.after_request
+def stop_profiling(response):
+    profiler = g.pop('profiler', None)
+    if not profiler:
+        return response
+
+    profiler.disable()
+
+    worker_profilers = g.worker_profilers
+
+    if g.pop('is_profile_summary', False):
+        if response.is_streamed:
+            for _ in profile_stream(response.response, profiler, lambda: None):
+                pass
+
+        stats = get_profile_stats(profiler, worker_profilers)
+        return make_data_response(get_profile_summary(stats, response.status_code), 200, { 'Cache-Control': 'no-store' })
+
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+
+    profile_name = re.sub(r'[^A-Za-z0-9_.-]', '_', request.path.strip('/'))
+    profile_file = os.path.join(PROFILING_DIR, f'{datetime.now().strftime("%Y%m%d%H%M%S%f")}-{profile_name}.prof')
+
+    response.headers['X-Profile-File'] = profile_file
+
+    if response.is_streamed:
+        response.response = profile_stream(response.response, profiler, lambda: save_profile(get_profile_stats(profiler, worker_profilers), profile_file))
+        return response
+
+    save_profile(get_profile_stats(profiler, worker_profilers), profile_file)
+
+    return response
+
+@app.route('/crawl/<share_kind>', methods=['POST'])
+def crawl_share_kind(share_kind):
+    return crawl_universe(share_kind)
+
+@app.route('/screen/<share_kind>', methods=['GET'])
+def screen_share_kind(share_kind):
+    return screen_snapshot(share_kind)
+
 @app.route('/reit/<ticker>', methods=['GET'])
 def get_reit_data(ticker):
     return get_share_data(ticker, 'reits', get_stock_or_reit_from_sources)
@@ -742,12 +1265,84 @@ def get_stock_data(ticker):
 def get_etf_data(ticker):
     return get_share_data(ticker, '', get_etf_from_sources)
 
+def get_partial_data(ticker, info_names, partial_data):
+    gathered_data = { info: partial_data[info] for info in info_names if partial_data.get(info) is not None }
+    missing_info_names = [ info for info in info_names if info not in gathered_data ]
+
+    log_info(f'Latency budget exceeded for "{ticker}", missing info: {missing_info_names}')
+
+    return { **gathered_data, 'missing_info_names': missing_info_names }
+
+def start_late_fetch(fetch_data):
+    future = Future()
+
+    def run_fetch():
+        try:
+            future.set_result(fetch_data())
+        except Exception as error:
+            future.set_exception(error)
+        finally:
+            LATE_FETCH_SLOTS.release()
+
+    threading.Thread(target=run_fetch, daemon=True).start()
+
+    return future
+
+def get_ticker_data(ticker, share_type, source, info_names, should_delete_all_cache, should_clear_cached_data, should_use_cache, get_data_from_sources, get_cached_data=read_cache, deadline=None):
+    can_use_cache = preprocess_cache(ticker, should_delete_all_cache, should_clear_cached_data, should_use_cache)
+
+    cached_data = get_data_from_cache(ticker, info_names, can_use_cache, get_cached_data)
+    partial_data = dict(cached_data or {})
+
+    def fetch_data():
+        source_data, data = get_data(ticker, share_type, source, info_names, can_use_cache, cached_data, get_data_from_sources, partial_data)
+
+        log_debug(f'Final Data for "{ticker}": {data}')
+
+        if source_data and can_use_cache:
+            upsert_cache(ticker, source_data)
+
+        return data
+
+    is_fully_cached = can_use_cache and not filter_remaining_infos(cached_data, info_names)
+
+    if not deadline or is_fully_cached:
+        return can_use_cache, fetch_data()
+
+    if not LATE_FETCH_SLOTS.acquire(blocking=False):
+        log_error(f'{LATE_FETCH_MAX_THREADS} late fetches already in flight, answering "{ticker}" from cache only')
+        return False, get_partial_data(ticker, info_names, partial_data)
+
+    future = start_late_fetch(profile_call(fetch_data))
+
+    try:
+        return can_use_cache, future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FutureTimeoutError:
+        return False, get_partial_data(ticker, info_names, partial_data)
+
+def parse_max_latency_ms(raw_max_latency_ms):
+    try:
+        max_latency_ms = float(raw_max_latency_ms)
+    except ValueError:
+        raise ValueError(f'Invalid max latency "{raw_max_latency_ms}"')
+
+    if not math.isfinite(max_latency_ms) or max_latency_ms < 0:
+        raise ValueError(f'Invalid max latency "{raw_max_latency_ms}"')
+
+    return min(max_latency_ms, REQUEST_TIMEOUT * 1_000)
+
 def get_share_data(ticker, share_type, get_data_from_sources):
     should_delete_all_cache = get_cache_parameter_info(request.args, 'should_delete_all_cache')
     should_clear_cached_data = get_cache_parameter_info(request.args, 'should_clear_cached_data')
     should_use_cache = get_cache_parameter_info(request.args, 'should_use_cache', '1')
 
-    ticker = ticker.upper()
+    tickers = list(dict.fromkeys(ticker.strip() for ticker in ticker.upper().split(',')))
+
+    if not all(TICKER_PATTERN.match(ticker) for ticker in tickers):
+        return make_data_response({ 'error': 'Invalid ticker' }, 400)
+
+    if len(tickers) > MAX_TICKERS_PER_REQUEST:
+        return make_data_response({ 'error': f'At most {MAX_TICKERS_PER_REQUEST} tickers per request' }, 400)
 
     raw_source = get_parameter_info(request.args, 'source', VALID_SOURCES['ALL_SOURCE'])
     source = raw_source if raw_source in VALID_SOURCES.values() else VALID_SOURCES['ALL_SOURCE']
@@ -756,22 +1351,380 @@ def get_share_data(ticker, share_type, get_data_from_sources):
     info_names = raw_info_names if len(raw_info_names) else VALID_INFOS
 
     log_debug(f'Should Delete cache? {should_delete_all_cache} - Should Clear cache? {should_clear_cached_data} - Should Use cache? {should_use_cache}')
-    log_debug(f'Ticker: {ticker} - Source: {source} - Info names: {info_names}')
 
-    can_use_cache = preprocess_cache(ticker, should_delete_all_cache, should_clear_cached_data, should_use_cache)
+    try:
+        max_latency_ms = parse_max_latency_ms(get_parameter_info(request.args, 'max_latency_ms', '0'))
+    except ValueError as error:
+        return make_data_response({ 'error': str(error) }, 400)
+
+    deadline = time.monotonic() + max_latency_ms / 1_000 if max_latency_ms > 0 else None
+
+    log_debug(f'Tickers: {tickers} - Source: {source} - Info names: {info_names} - Max latency: {max_latency_ms}ms')
 
-    should_update_cache, data = get_data(ticker, share_type, source, info_names, can_use_cache, get_data_from_sources)
+    if should_delete_all_cache:
+        delete_cache()
+        should_use_cache = False
+
+    get_data_by_ticker = lambda ticker, get_cached_data=read_cache: get_ticker_data(ticker, share_type, source, info_names, False, should_clear_cached_data, should_use_cache, get_data_from_sources, get_cached_data, deadline)
 
-    log_debug(f'Final Data: {data}')
+    if len(tickers) > 1:
+        can_preload_cache = should_use_cache and not should_clear_cached_data
+        return get_multiple_share_data(tickers, get_data_by_ticker, can_preload_cache)
+
+    ticker = tickers[0]
+
+    can_use_cache, data = get_data_by_ticker(ticker)
 
     if not data:
-        return jsonify({ 'error': 'No data found' }), 404
+        return make_data_response({ 'error': 'No data found' }, 404)
+
+    if 'missing_info_names' in data:
+        if len(data) == 1:
+            return make_data_response({ 'error': 'Latency budget exceeded', **data }, 504, { 'Cache-Control': 'no-store' })
+
+        return make_data_response(data, 200, { 'Cache-Control': 'no-store' })
+
+    etag = get_etag(ticker, data, get_response_mimetype())
+    headers = {
+        'Cache-Control': get_cache_control(ticker, info_names, can_use_cache),
+        'ETag': f'W/"{etag}"',
+        'Vary': VARY_HEADER
+    }
+
+    if request.if_none_match.contains_weak(etag):
+        log_debug(f'ETag match for "{ticker}", answering Not Modified')
+        return '', 304, headers
+
+    return make_data_response(data, 200, headers)
+
+def get_multiple_share_data(tickers, get_data_by_ticker, can_preload_cache):
+    if can_preload_cache:
+        cached_data_by_ticker = read_caches(tickers)
+        get_all_data_by_ticker = get_data_by_ticker
+        get_data_by_ticker = lambda ticker: get_all_data_by_ticker(ticker, cached_data_by_ticker.get)
+
+    if get_response_mimetype([ NDJSON_MIMETYPE ]) == NDJSON_MIMETYPE:
+        return stream_ndjson_response(tickers, get_data_by_ticker)
+
+    data_by_ticker = {}
+    for ticker in tickers:
+        _, data = get_data_by_ticker(ticker)
+        data_by_ticker[ticker] = data
+
+    if not any(data_by_ticker.values()):
+        return make_data_response({ 'error': 'No data found' }, 404)
+
+    return make_data_response(data_by_ticker, 200, { 'Cache-Control': 'no-cache' })
+
+SHARE_KINDS = {
+    'etf': ('', get_etf_from_sources),
+    'reit': ('reits', get_stock_or_reit_from_sources),
+    'stock': ('stocks', get_stock_or_reit_from_sources)
+}
+
+def to_column_value(info, value):
+    if info in TEXT_INFOS:
+        return '' if value is None else str(value)
+
+    if isinstance(value, bool):
+        return np.nan
+
+    if isinstance(value, (int, float)):
+        return float(value)
 
-    if can_use_cache and should_update_cache:
-        upsert_cache(ticker, data)
+    if isinstance(value, str):
+        return text_to_number(value, default=np.nan)
 
-    return jsonify(data), 200
+    return np.nan
+
+def from_column_value(value):
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+
+    return str(value) or None
+
+def serialize_column(column):
+    buffer = io.BytesIO()
+    np.save(buffer, column)
+    return buffer.getvalue()
+
+def get_snapshot_link(share_kind):
+    return os.path.join(SNAPSHOT_DIR, share_kind)
+
+def get_local_snapshot_version(share_kind):
+    snapshot_link = get_snapshot_link(share_kind)
+    if not os.path.islink(snapshot_link):
+        return None
+
+    return os.path.basename(os.readlink(snapshot_link)).removeprefix(f'{share_kind}-')
+
+def install_snapshot(share_kind, version, column_files):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+
+    version_name = f'{share_kind}-{version}'
+    version_path = os.path.join(SNAPSHOT_DIR, version_name)
+
+    if not os.path.isdir(version_path):
+        temporary_path = tempfile.mkdtemp(dir=SNAPSHOT_DIR, prefix=f'.{version_name}-')
+
+        for name, content in column_files.items():
+            with open(os.path.join(temporary_path, f'{name}.npy'), 'wb') as column_file:
+                column_file.write(content)
+
+        os.rename(temporary_path, version_path)
+
+    snapshot_link = get_snapshot_link(share_kind)
+    temporary_link = f'{snapshot_link}.{uuid.uuid4().hex}'
+    os.symlink(version_name, temporary_link)
+    os.replace(temporary_link, snapshot_link)
+
+    for name in os.listdir(SNAPSHOT_DIR):
+        old_version_path = os.path.join(SNAPSHOT_DIR, name)
+        is_old_version = name.startswith(f'{share_kind}-') and name != version_name and os.path.isdir(old_version_path)
+
+        if is_old_version and datetime.now() - datetime.fromtimestamp(os.path.getmtime(old_version_path)) > SNAPSHOT_RETENTION:
+            shutil.rmtree(old_version_path, ignore_errors=True)
+
+    log_info(f'Snapshot version "{version}" installed for "{share_kind}"')
+
+def get_remote_snapshot_key(share_kind):
+    return f'{CACHE_REDIS_PREFIX}-snapshot:{share_kind}'
+
+def publish_remote_snapshot(remote_cache, share_kind, version, column_files):
+    remote_cache.hset(get_remote_snapshot_key(share_kind), mapping={ 'version': version, **column_files })
+    log_info(f'Snapshot version "{version}" published for "{share_kind}"')
+
+def read_remote_snapshot(remote_cache, share_kind, local_version):
+    remote_version = remote_cache.hget(get_remote_snapshot_key(share_kind), 'version')
+    if not remote_version or remote_version.decode() == local_version:
+        return None
+
+    remote_snapshot = { name.decode(): content for name, content in remote_cache.hgetall(get_remote_snapshot_key(share_kind)).items() }
+    version = remote_snapshot.pop('version').decode()
+
+    log_debug(f'Remote snapshot version "{version}" found for "{share_kind}"')
+
+    return version, remote_snapshot
+
+def sync_remote_snapshot(share_kind):
+    remote_snapshot = call_cache(read_remote_snapshot, lambda share_kind, local_version: None, share_kind, get_local_snapshot_version(share_kind))
+    if remote_snapshot:
+        install_snapshot(share_kind, *remote_snapshot)
+
+def read_snapshot(share_kind):
+    sync_remote_snapshot(share_kind)
+
+    snapshot_link = get_snapshot_link(share_kind)
+    if not os.path.islink(snapshot_link):
+        log_info(f'No snapshot found for "{share_kind}"')
+        return None
+
+    version_path = os.path.realpath(snapshot_link)
+
+    cached_snapshot = SNAPSHOTS.get(share_kind)
+    if cached_snapshot and cached_snapshot[0] == version_path:
+        return cached_snapshot[1]
+
+    columns = { name: np.load(os.path.join(version_path, f'{name}.npy'), mmap_mode='r') for name in [ 'ticker', *SNAPSHOT_INFOS ] }
+
+    SNAPSHOTS[share_kind] = (version_path, columns)
+    log_debug(f'Snapshot for "{share_kind}" mapped with {len(columns["ticker"])} tickers')
+
+    return columns
+
+def read_snapshot_data(share_kind):
+    columns = read_snapshot(share_kind)
+    if not columns:
+        return {}
+
+    return { str(ticker): { info: from_column_value(columns[info][position]) for info in SNAPSHOT_INFOS } for position, ticker in enumerate(columns['ticker']) }
+
+def write_snapshot(share_kind, data_by_ticker, should_replace_snapshot):
+    with SNAPSHOT_LOCK:
+        all_data_by_ticker = data_by_ticker if should_replace_snapshot else { **read_snapshot_data(share_kind), **data_by_ticker }
+
+        tickers = sorted(all_data_by_ticker)
+
+        column_files = { 'ticker': serialize_column(np.array(tickers, dtype=str)) }
+        for info in SNAPSHOT_INFOS:
+            values = [ to_column_value(info, all_data_by_ticker[ticker].get(info)) for ticker in tickers ]
+            column_files[info] = serialize_column(np.array(values, dtype=str if info in TEXT_INFOS else np.float64))
+
+        version = f'{datetime.now().strftime("%Y%m%d%H%M%S%f")}-{uuid.uuid4().hex[:8]}'
+
+        install_snapshot(share_kind, version, column_files)
+        call_cache(publish_remote_snapshot, lambda share_kind, version, column_files: None, share_kind, version, column_files)
+
+    log_info(f'Snapshot for "{share_kind}" written with {len(tickers)} tickers')
+
+    return len(tickers)
+
+def crawl_tickers(share_kind, tickers, source, should_use_cache, should_replace_snapshot):
+    share_type, get_data_from_sources = SHARE_KINDS[share_kind]
+
+    log_debug(f'Crawling {len(tickers)} tickers of "{share_kind}" - Source: {source} - Should Use cache? {should_use_cache}')
+
+    cached_data_by_ticker = read_caches(tickers) if should_use_cache else {}
+
+    def get_data_by_ticker(ticker):
+        missing_number_token = MISSING_NUMBER.set(None)
+
+        try:
+            return get_ticker_data(ticker, share_type, source, SNAPSHOT_INFOS, False, False, should_use_cache, get_data_from_sources, cached_data_by_ticker.get)[1]
+        finally:
+            MISSING_NUMBER.reset(missing_number_token)
+
+    with ThreadPoolExecutor(max_workers=SNAPSHOT_CRAWL_WORKERS) as executor:
+        crawled_data = dict(zip(tickers, executor.map(profile_call(get_data_by_ticker), tickers)))
+
+    data_by_ticker = { ticker: data for ticker, data in crawled_data.items() if data }
+    missing_tickers = [ ticker for ticker, data in crawled_data.items() if not data ]
+
+    total_tickers = write_snapshot(share_kind, data_by_ticker, should_replace_snapshot) if data_by_ticker else 0
+
+    return data_by_ticker, missing_tickers, total_tickers
+
+def get_crawl_tickers():
+    body = request.get_json(silent=True)
+
+    if isinstance(body, dict):
+        raw_tickers = body.get('tickers') or []
+    elif isinstance(body, list):
+        raw_tickers = body
+    else:
+        raw_tickers = re.split(r'[\s,]+', request.get_data(as_text=True))
+
+    return sorted({ str(ticker).strip().upper() for ticker in raw_tickers if str(ticker).strip() })
+
+def is_crawl_authorized():
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    return hmac.compare_digest(token.encode(), SNAPSHOT_CRAWL_TOKEN.encode())
+
+def crawl_universe(share_kind):
+    if not SNAPSHOT_CRAWL_TOKEN:
+        return make_data_response({ 'error': 'Crawl endpoint disabled, use "python index.py crawl"' }, 404)
+
+    if not is_crawl_authorized():
+        return make_data_response({ 'error': 'Invalid crawl token' }, 401)
+
+    if share_kind not in SHARE_KINDS:
+        return make_data_response({ 'error': f'Invalid share kind "{share_kind}"' }, 400)
+
+    should_use_cache = get_cache_parameter_info(request.args, 'should_use_cache')
+    should_replace_snapshot = get_cache_parameter_info(request.args, 'should_replace_snapshot')
+
+    tickers = get_crawl_tickers()
+    if not tickers:
+        return make_data_response({ 'error': 'No tickers informed' }, 400)
+
+    if len(tickers) > SNAPSHOT_CRAWL_MAX_TICKERS:
+        return make_data_response({ 'error': f'At most {SNAPSHOT_CRAWL_MAX_TICKERS} tickers per request, send the universe in batches' }, 413)
+
+    raw_source = get_parameter_info(request.args, 'source', VALID_SOURCES['ALL_SOURCE'])
+    source = raw_source if raw_source in VALID_SOURCES.values() else VALID_SOURCES['ALL_SOURCE']
+
+    data_by_ticker, missing_tickers, total_tickers = crawl_tickers(share_kind, tickers, source, should_use_cache, should_replace_snapshot)
+
+    if not data_by_ticker:
+        return make_data_response({ 'error': 'No data found', 'missing_tickers': missing_tickers }, 404)
+
+    return make_data_response({ 'crawled': len(data_by_ticker), 'missing_tickers': missing_tickers, 'snapshot_tickers': total_tickers }, 200)
+
+def crawl_universe_file(share_kind, tickers_file, source=VALID_SOURCES['ALL_SOURCE']):
+    with open(tickers_file, 'r') as file:
+        tickers = sorted({ ticker.strip().upper() for ticker in re.split(r'[\s,]+', file.read()) if ticker.strip() })
+
+    crawled_tickers = 0
+    missing_tickers = []
+
+    for batch_start in range(0, len(tickers), SNAPSHOT_CRAWL_MAX_TICKERS):
+        batch = tickers[batch_start:batch_start + SNAPSHOT_CRAWL_MAX_TICKERS]
+        data_by_ticker, batch_missing_tickers, _ = crawl_tickers(share_kind, batch, source, False, batch_start == 0)
+
+        crawled_tickers += len(data_by_ticker)
+        missing_tickers += batch_missing_tickers
+
+        log_info(f'Crawled {batch_start + len(batch)} of {len(tickers)} tickers of "{share_kind}"')
+
+    print(f'Crawled {crawled_tickers} tickers of "{share_kind}", missing: {missing_tickers}')
+
+def parse_screen_info(raw_info):
+    if raw_info not in SNAPSHOT_INFOS:
+        raise ValueError(f'Info "{raw_info}" is not available for screening')
+
+    return raw_info
+
+def parse_screen_filter(raw_filter):
+    match = SCREEN_FILTER_PATTERN.match(raw_filter)
+    if not match:
+        raise ValueError(f'Invalid filter "{raw_filter}"')
+
+    info, operator, raw_value = match.groups()
+    parse_screen_info(info)
+
+    if info in TEXT_INFOS:
+        return info, operator, raw_value
+
+    try:
+        return info, operator, float(raw_value.replace(',', '.'))
+    except ValueError:
+        raise ValueError(f'Invalid number "{raw_value}" in filter "{raw_filter}"')
+
+def screen_snapshot(share_kind):
+    if share_kind not in SHARE_KINDS:
+        return make_data_response({ 'error': f'Invalid share kind "{share_kind}"' }, 400)
+
+    try:
+        filters = [ parse_screen_filter(raw_filter) for raw_filter in get_parameter_info(request.args, 'filters', '').split(SCREEN_FILTER_SEPARATOR) if raw_filter ]
+        raw_info_names = [ parse_screen_info(info) for info in get_parameter_info(request.args, 'info_names', '').split(',') if info ]
+
+        sort_by = get_parameter_info(request.args, 'sort_by', '')
+        is_descending = sort_by.startswith('-')
+        sort_by = parse_screen_info(sort_by.lstrip('-')) if sort_by else None
+
+        limit = int(get_parameter_info(request.args, 'limit', '0'))
+    except ValueError as error:
+        return make_data_response({ 'error': str(error) }, 400)
+
+    info_names = raw_info_names if len(raw_info_names) else SNAPSHOT_INFOS
+
+    columns = read_snapshot(share_kind)
+    if not columns:
+        return make_data_response({ 'error': 'No snapshot found' }, 404)
+
+    log_debug(f'Screening "{share_kind}" - Filters: {filters} - Sort by: {sort_by} - Limit: {limit}')
+
+    mask = np.ones(len(columns['ticker']), dtype=bool)
+
+    for info, operator, value in filters:
+        column = np.char.replace(np.char.lower(columns[info]), ' ', '') if info in TEXT_INFOS else columns[info]
+        mask &= SCREEN_OPERATORS[operator](column, value)
+
+    indexes = np.flatnonzero(mask)
+
+    if sort_by:
+        sort_column = columns[sort_by][indexes]
+
+        if sort_by in TEXT_INFOS:
+            order = np.argsort(np.char.lower(sort_column), kind='stable')
+            order = order[::-1] if is_descending else order
+        else:
+            order = np.argsort(-sort_column if is_descending else sort_column, kind='stable')
+
+        indexes = indexes[order]
+
+    if limit > 0:
+        indexes = indexes[:limit]
+
+    projected_columns = { info: columns[info][indexes] for info in [ 'ticker', *info_names ] }
+
+    data = [ { info: from_column_value(projected_columns[info][position]) for info in projected_columns } for position in range(len(indexes)) ]
+
+    return make_data_response(data, 200)
 
 if __name__ == '__main__':
-    log_debug('Starting stockCrawler API')
-    app.run(debug=LOG_LEVEL == 'DEBUG')
+    if sys.argv[1:2] == [ 'crawl' ]:
+        crawl_universe_file(*sys.argv[2:])
+    else:
+        log_debug('Starting stockCrawler API')
+        app.run(debug=LOG_LEVEL == 'DEBUG')
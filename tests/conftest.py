@@ -0,0 +1,72 @@
+from datetime import datetime
+import functools
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import index
+
+CRAWL_TOKEN = 'crawl-token'
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(index, 'CACHE_FILE', str(tmp_path / 'cache.txt'))
+    monkeypatch.setattr(index, 'SNAPSHOT_DIR', str(tmp_path / 'snapshot'))
+    monkeypatch.setattr(index, 'PROFILING_DIR', str(tmp_path / 'profiles'))
+    monkeypatch.setattr(index, 'SNAPSHOT_CRAWL_TOKEN', CRAWL_TOKEN)
+    monkeypatch.setattr(index, 'CACHE_REDIS_URL', None)
+    monkeypatch.setitem(index.REMOTE_CACHE, 'client', None)
+    monkeypatch.setitem(index.REMOTE_CACHE, 'should_replay_local_cache', False)
+    monkeypatch.setitem(index.REMOTE_CACHE, 'unavailable_until', None)
+
+@pytest.fixture
+def client():
+    return index.app.test_client()
+
+@pytest.fixture
+def fake_sources(monkeypatch):
+    data_by_ticker = {}
+    calls = []
+
+    def get_from_sources(ticker, share_type, source, info_names, *args):
+        calls.append((ticker, list(info_names)))
+        data = data_by_ticker.get(ticker)
+        return { info: data.get(info) for info in info_names } if data else None
+
+    monkeypatch.setattr(index, 'get_stock_or_reit_from_sources', get_from_sources)
+
+    return data_by_ticker, calls
+
+def post_crawl(client, url, **kwargs):
+    return client.post(url, headers={ 'Authorization': f'Bearer {CRAWL_TOKEN}' }, **kwargs)
+
+def write_cache_line(id, data, field_dates):
+    field_dates_as_text = { info: date.strftime(index.DATE_FORMAT) for info, date in field_dates.items() }
+
+    with open(index.CACHE_FILE, 'a') as cache_file:
+        cache_file.write(f'{id}{index.SEPARATOR}{datetime.now().strftime(index.DATE_FORMAT)}{index.SEPARATOR}{data}{index.SEPARATOR}{field_dates_as_text}\n')
+
+@pytest.fixture
+def stockanalysis_stand_in(monkeypatch):
+    fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'stockanalysis')
+    handler = functools.partial(QuietHandler, directory=fixtures_dir)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, kwargs={ 'poll_interval': 0.01 }, daemon=True).start()
+
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    original_get = index.requests.get
+    monkeypatch.setattr(index.requests, 'get', lambda url, **kwargs: original_get(url.replace('https://stockanalysis.com', base_url), **kwargs))
+
+    yield base_url
+
+    server.shutdown()
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+import re
+
+from conftest import write_cache_line
+
+import index
+
+def get_max_age(response):
+    return int(re.search(r'max-age=(\d+)', response.headers['Cache-Control']).group(1))
+
+def test_local_cache_drops_expired_fields():
+    now = datetime.now()
+    write_cache_line('AAA', { 'name': 'Alpha', 'price': 10.0 }, { 'name': now, 'price': now - timedelta(hours=1) })
+
+    assert index.read_local_cache('AAA') == { 'name': 'Alpha' }
+
+def test_local_cache_clears_fully_expired_entry():
+    write_cache_line('AAA', { 'price': 10.0 }, { 'price': datetime.now() - timedelta(hours=1) })
+
+    assert index.read_local_cache('AAA') is None
+    assert index.read_local_cache_entry('AAA') == (None, None)
+
+def test_local_cache_reads_legacy_lines_with_entry_date():
+    with open(index.CACHE_FILE, 'w') as cache_file:
+        cache_file.write(f"AAA{index.SEPARATOR}{datetime.now().strftime(index.DATE_FORMAT)}{index.SEPARATOR}{{'name': 'Alpha'}}\n")
+
+    assert index.read_local_cache('AAA') == { 'name': 'Alpha' }
+
+def test_local_upsert_refreshes_only_written_fields():
+    old_date = datetime.now() - timedelta(hours=3)
+    write_cache_line('AAA', { 'name': 'Alpha', 'price': 10.0 }, { 'name': old_date, 'price': old_date })
+
+    index.upsert_local_cache('AAA', { 'price': 11.0 })
+
+    field_expiries = index.read_local_cache_expiries('AAA')
+    assert field_expiries['price'] > index.get_field_expiry('price') - timedelta(minutes=1)
+    assert field_expiries['name'] < index.get_field_expiry('name') - timedelta(hours=2)
+
+def test_local_cache_does_not_match_ticker_prefix():
+    write_cache_line('VOO', { 'name': 'Vanguard' }, { 'name': datetime.now() })
+
+    assert index.read_local_cache('V') is None
+
+def test_cache_control_follows_served_fields_expiry(client, fake_sources):
+    write_cache_line('AAA', { 'name': 'Alpha' }, { 'name': datetime.now() - timedelta(minutes=20) })
+
+    response = client.get('/stock/AAA?info_names=name')
+
+    assert response.status_code == 200
+    expected_max_age = (index.get_field_expiry('name') - timedelta(minutes=20)).total_seconds()
+    assert expected_max_age - 5 <= get_max_age(response) <= expected_max_age
+
+def test_cache_control_after_refresh_uses_new_field_date(client, fake_sources):
+    data_by_ticker, calls = fake_sources
+    data_by_ticker['AAA'] = { 'price': 12.0 }
+    write_cache_line('AAA', { 'name': 'Alpha', 'price': 10.0 }, { 'name': datetime.now(), 'price': datetime.now() - timedelta(hours=1) })
+
+    response = client.get('/stock/AAA?info_names=name,price')
+
+    assert response.get_json() == { 'name': 'Alpha', 'price': 12.0 }
+    assert calls == [ ('AAA', [ 'price' ]) ]
+    assert get_max_age(response) > index.get_field_expiry('price').total_seconds() - 5
+
+def test_matching_etag_returns_not_modified(client, fake_sources):
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+
+    first_response = client.get('/stock/AAA?info_names=name')
+    second_response = client.get('/stock/AAA?info_names=name', headers={ 'If-None-Match': first_response.headers['ETag'] })
+
+    assert second_response.status_code == 304
+    assert second_response.data == b''
+    assert second_response.headers['ETag'] == first_response.headers['ETag']
+
+def test_etag_depends_on_negotiated_mimetype(client, fake_sources):
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+
+    json_response = client.get('/stock/AAA?info_names=name', headers={ 'Accept': index.JSON_MIMETYPE })
+    msgpack_response = client.get('/stock/AAA?info_names=name', headers={ 'Accept': index.MSGPACK_MIMETYPE, 'If-None-Match': json_response.headers['ETag'] })
+
+    assert msgpack_response.status_code == 200
+    assert msgpack_response.mimetype == index.MSGPACK_MIMETYPE
+    assert msgpack_response.headers['ETag'] != json_response.headers['ETag']
@@ -0,0 +1,98 @@
+from datetime import datetime
+import threading
+import time
+
+import pytest
+
+from conftest import write_cache_line
+
+import index
+
+@pytest.fixture
+def slow_sources(fake_sources, monkeypatch):
+    data_by_ticker, calls = fake_sources
+    release = threading.Event()
+    get_from_sources = index.get_stock_or_reit_from_sources
+
+    def get_from_slow_sources(ticker, share_type, source, info_names, *args):
+        release.wait(5)
+        return get_from_sources(ticker, share_type, source, info_names, *args)
+
+    monkeypatch.setattr(index, 'get_stock_or_reit_from_sources', get_from_slow_sources)
+
+    yield data_by_ticker, release
+
+    release.set()
+
+def test_partial_response_lists_missing_infos(client, slow_sources):
+    data_by_ticker, release = slow_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha', 'price': 10.0 }
+    write_cache_line('AAA', { 'name': 'Alpha' }, { 'name': datetime.now() })
+
+    started_at = time.monotonic()
+    response = client.get('/stock/AAA?info_names=name,price&max_latency_ms=100')
+
+    assert time.monotonic() - started_at < 1
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert response.get_json() == { 'name': 'Alpha', 'missing_info_names': [ 'price' ] }
+
+def test_empty_partial_response_is_gateway_timeout(client, slow_sources):
+    response = client.get('/stock/AAA?info_names=name&max_latency_ms=50')
+
+    assert response.status_code == 504
+    assert response.get_json()['missing_info_names'] == [ 'name' ]
+
+def test_late_fetch_fills_cache(client, slow_sources):
+    data_by_ticker, release = slow_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+
+    client.get('/stock/AAA?info_names=name&max_latency_ms=50')
+    release.set()
+
+    for _ in range(100):
+        if index.read_local_cache('AAA'):
+            break
+        time.sleep(0.01)
+
+    assert index.read_local_cache('AAA') == { 'name': 'Alpha' }
+
+def test_cached_ticker_is_not_queued_behind_slow_fetches(client, slow_sources):
+    write_cache_line('PETR4', { 'name': 'Petrobras' }, { 'name': datetime.now() })
+
+    slow_requests = [ threading.Thread(target=index.app.test_client().get, args=(f'/stock/SLOW{number}?info_names=name&max_latency_ms=2000',)) for number in range(12) ]
+    for slow_request in slow_requests:
+        slow_request.start()
+
+    response = client.get('/stock/PETR4?info_names=name&max_latency_ms=300')
+
+    assert response.status_code == 200
+    assert response.get_json() == { 'name': 'Petrobras' }
+
+    slow_sources[1].set()
+    for slow_request in slow_requests:
+        slow_request.join()
+
+def test_exhausted_late_fetch_slots_answer_from_cache(client, slow_sources, monkeypatch):
+    monkeypatch.setattr(index, 'LATE_FETCH_SLOTS', threading.BoundedSemaphore(1))
+    index.LATE_FETCH_SLOTS.acquire()
+    write_cache_line('AAA', { 'name': 'Alpha' }, { 'name': datetime.now() })
+
+    started_at = time.monotonic()
+    response = client.get('/stock/AAA?info_names=name,price&max_latency_ms=2000')
+
+    assert time.monotonic() - started_at < 1
+    assert response.get_json() == { 'name': 'Alpha', 'missing_info_names': [ 'price' ] }
+
+@pytest.mark.parametrize('max_latency_ms', [ 'inf', 'nan', '-1', '10%', '$5', 'abc' ])
+def test_invalid_max_latency_is_rejected(client, fake_sources, max_latency_ms):
+    response = client.get(f'/stock/AAA?info_names=name&max_latency_ms={max_latency_ms}')
+
+    assert response.status_code == 400
+
+def test_max_latency_is_capped_at_request_timeout(client, slow_sources, monkeypatch):
+    monkeypatch.setattr(index, 'REQUEST_TIMEOUT', 0.05)
+
+    response = client.get('/stock/AAA?info_names=name&max_latency_ms=1e30')
+
+    assert response.status_code == 504
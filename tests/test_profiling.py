@@ -0,0 +1,100 @@
+import cProfile
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import post_crawl
+
+import index
+
+@pytest.fixture(autouse=True)
+def profiling_enabled(monkeypatch):
+    monkeypatch.setattr(index, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(index, 'PROFILING_TOP_FUNCTIONS', 1_000)
+
+def get_profiled_functions(response):
+    return ' '.join(function['function'] for function in response.get_json()['top_functions'])
+
+def test_summary_includes_latency_budget_worker(client, fake_sources):
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+
+    response = client.get('/stock/AAA?info_names=name&max_latency_ms=5000&profile=summary')
+
+    assert response.get_json()['status'] == 200
+    assert '(get_from_sources)' in get_profiled_functions(response)
+
+def test_summary_includes_ndjson_stream_generation(client, fake_sources):
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+
+    response = client.get('/stock/AAA,BBB?info_names=name&profile=summary', headers={ 'Accept': index.NDJSON_MIMETYPE })
+
+    assert '(get_from_sources)' in get_profiled_functions(response)
+
+def test_summary_includes_crawl_workers(client, stockanalysis_stand_in):
+    response = post_crawl(client, '/crawl/reit?source=stockanalysis&profile=summary', json=[ 'AAA' ])
+
+    assert '(request_get)' in get_profiled_functions(response)
+
+def test_streamed_profile_is_saved_after_stream_ends(client, fake_sources):
+    response = client.get('/stock/AAA,BBB?profile=1', headers={ 'Accept': index.NDJSON_MIMETYPE })
+
+    assert len(response.data.splitlines()) == 2
+    assert os.path.exists(response.headers['X-Profile-File'])
+
+def test_profile_files_are_rotated(client, fake_sources, monkeypatch):
+    monkeypatch.setattr(index, 'PROFILING_MAX_FILES', 2)
+
+    profile_files = [ client.get('/stock/AAA', headers={ 'X-Profile': '1' }).headers['X-Profile-File'] for _ in range(3) ]
+
+    assert sorted(os.listdir(index.PROFILING_DIR)) == sorted(os.path.basename(profile_file) for profile_file in profile_files[1:])
+
+class SingleActiveProfile(cProfile.Profile):
+    active = None
+
+    def enable(self, *args, **kwargs):
+        if SingleActiveProfile.active not in (None, self):
+            raise ValueError('Another profiling tool is already active')
+
+        SingleActiveProfile.active = self
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+
+        if SingleActiveProfile.active is self:
+            SingleActiveProfile.active = None
+
+@pytest.fixture
+def single_active_profiler(monkeypatch):
+    monkeypatch.setattr(SingleActiveProfile, 'active', None)
+    monkeypatch.setattr(index.cProfile, 'Profile', SingleActiveProfile)
+
+def test_overlapping_profiled_requests_are_served(fake_sources, single_active_profiler, monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def get_from_sources(ticker, share_type, source, info_names, *args):
+        barrier.wait()
+        return { info: ticker for info in info_names }
+
+    monkeypatch.setattr(index, 'get_stock_or_reit_from_sources', get_from_sources)
+
+    def get(ticker):
+        return index.app.test_client().get(f'/stock/{ticker}?info_names=name&profile=1')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        responses = list(executor.map(get, [ 'AAA', 'BBB' ]))
+
+    assert [ response.status_code for response in responses ] == [ 200, 200 ]
+    assert [ 'X-Profile-File' in response.headers for response in responses ].count(True) == 1
+
+def test_stream_continues_when_profiler_is_taken(client, fake_sources, single_active_profiler):
+    response = client.get('/stock/AAA,BBB?profile=1', headers={ 'Accept': index.NDJSON_MIMETYPE })
+
+    SingleActiveProfile.active = object()
+
+    assert len(response.data.splitlines()) == 2
+    assert os.path.exists(response.headers['X-Profile-File'])
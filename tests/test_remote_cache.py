@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+import os
+
+import pytest
+
+import index
+
+fakeredis = pytest.importorskip('fakeredis')
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+
+    monkeypatch.setattr(index, 'CACHE_REDIS_URL', 'redis://stand-in')
+    monkeypatch.setitem(index.REMOTE_CACHE, 'client', fakeredis.FakeRedis(server=server))
+
+    return server
+
+def get_ttl(id, info):
+    return index.REMOTE_CACHE['client'].ttl(index.get_remote_cache_key(id, info))
+
+def test_upsert_sets_per_field_ttl(redis_server):
+    index.upsert_cache('AAA', { 'name': 'Alpha', 'price': 10.0 })
+
+    assert index.read_cache('AAA') == { 'name': 'Alpha', 'price': 10.0 }
+    assert get_ttl('AAA', 'price') == index.get_field_expiry('price').total_seconds()
+    assert get_ttl('AAA', 'name') == index.get_field_expiry('name').total_seconds()
+    assert not os.path.exists(index.CACHE_FILE)
+
+def test_refresh_rewrites_only_fetched_fields(client, fake_sources, redis_server, monkeypatch):
+    data_by_ticker, calls = fake_sources
+    data_by_ticker['AAA'] = { 'dy': 8.5, 'price': 11.0 }
+    monkeypatch.setitem(index.FIELD_CACHE_EXPIRY, 'dy', timedelta(seconds=10))
+
+    index.upsert_cache('AAA', { 'dy': 8.0, 'price': 10.0 })
+    index.REMOTE_CACHE['client'].delete(index.get_remote_cache_key('AAA', 'price'))
+
+    response = client.get('/stock/AAA?info_names=dy,price')
+
+    assert response.get_json() == { 'dy': 8.0, 'price': 11.0 }
+    assert calls == [ ('AAA', [ 'price' ]) ]
+    assert get_ttl('AAA', 'dy') <= 10
+
+def test_cache_control_uses_remote_ttl(client, fake_sources, redis_server, monkeypatch):
+    monkeypatch.setitem(index.FIELD_CACHE_EXPIRY, 'name', timedelta(seconds=100))
+    index.upsert_cache('AAA', { 'name': 'Alpha' })
+
+    response = client.get('/stock/AAA?info_names=name')
+
+    assert 'max-age=99' in response.headers['Cache-Control'] or 'max-age=100' in response.headers['Cache-Control']
+
+def test_read_caches_batches_tickers(redis_server):
+    index.upsert_cache('AAA', { 'name': 'Alpha' })
+    index.upsert_cache('BBB', { 'name': 'Beta' })
+
+    assert index.read_caches([ 'AAA', 'BBB', 'CCC' ]) == { 'AAA': { 'name': 'Alpha' }, 'BBB': { 'name': 'Beta' }, 'CCC': None }
+
+def test_multiple_tickers_are_served_from_one_batch(client, fake_sources, redis_server, monkeypatch):
+    index.upsert_cache('AAA', { 'name': 'Alpha' })
+    index.upsert_cache('BBB', { 'name': 'Beta' })
+
+    monkeypatch.setattr(index, 'read_cache', lambda id: pytest.fail('single ticker lookup'))
+
+    response = client.get('/stock/AAA,BBB?info_names=name')
+
+    assert response.get_json() == { 'AAA': { 'name': 'Alpha' }, 'BBB': { 'name': 'Beta' } }
+
+def test_falls_back_to_local_cache_and_replays_it(redis_server):
+    redis_server.connected = False
+
+    index.upsert_cache('AAA', { 'name': 'Alpha' })
+
+    assert index.REMOTE_CACHE['unavailable_until'] is not None
+    assert index.read_cache('AAA') == { 'name': 'Alpha' }
+
+    redis_server.connected = True
+    index.REMOTE_CACHE['unavailable_until'] = datetime.now() - timedelta(seconds=1)
+
+    assert index.read_cache('AAA') == { 'name': 'Alpha' }
+    assert not os.path.exists(index.CACHE_FILE)
+    assert get_ttl('AAA', 'name') > 0
+
+def test_replay_keeps_newer_remote_values(redis_server):
+    redis_server.connected = False
+    index.upsert_cache('AAA', { 'name': 'Old Alpha' })
+
+    redis_server.connected = True
+    index.REMOTE_CACHE['client'].set(index.get_remote_cache_key('AAA', 'name'), repr('New Alpha'))
+    index.REMOTE_CACHE['unavailable_until'] = None
+
+    assert index.read_cache('AAA') == { 'name': 'New Alpha' }
+
+def test_delete_all_cache_keeps_shared_keys_by_default(client, fake_sources, redis_server, monkeypatch):
+    index.upsert_cache('BBB', { 'name': 'Beta' })
+
+    client.get('/stock/AAA?info_names=name&should_delete_all_cache=1')
+
+    assert index.read_cache('BBB') == { 'name': 'Beta' }
+
+    monkeypatch.setattr(index, 'CACHE_REDIS_ALLOW_FLUSH', True)
+
+    client.get('/stock/AAA?info_names=name&should_delete_all_cache=1')
+
+    assert not index.read_cache('BBB')
@@ -0,0 +1,98 @@
+import gzip
+
+import pytest
+
+import index
+
+def test_error_response_is_compressed_with_vary(client, fake_sources, monkeypatch):
+    monkeypatch.setattr(index, 'COMPRESSION_MIN_SIZE', 0)
+
+    response = client.get('/stock/AAA', headers={ 'Accept-Encoding': 'gzip' })
+
+    assert response.status_code == 404
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == index.VARY_HEADER
+    assert gzip.decompress(response.data) == b'{"error":"No data found"}'
+
+def test_ndjson_streams_one_line_per_ticker(client, fake_sources):
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+
+    response = client.get('/stock/AAA,BBB?info_names=name', headers={ 'Accept': index.NDJSON_MIMETYPE })
+
+    assert response.mimetype == index.NDJSON_MIMETYPE
+    assert response.data.decode().splitlines() == [
+        '{"ticker":"AAA","data":{"name":"Alpha"}}',
+        '{"ticker":"BBB","error":"No data found"}'
+    ]
+
+def test_multiple_tickers_delete_cache_only_once(client, fake_sources, monkeypatch):
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+    data_by_ticker['BBB'] = { 'name': 'Beta' }
+
+    deletions = []
+    monkeypatch.setattr(index, 'delete_cache', lambda: deletions.append(True))
+
+    response = client.get('/stock/AAA,BBB?info_names=name&should_delete_all_cache=1')
+
+    assert response.get_json() == { 'AAA': { 'name': 'Alpha' }, 'BBB': { 'name': 'Beta' } }
+    assert len(deletions) == 1
+
+def test_msgpack_response(client, fake_sources):
+    msgpack = pytest.importorskip('msgpack')
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha', 'price': 10.5 }
+
+    response = client.get('/stock/AAA?info_names=name,price', headers={ 'Accept': index.MSGPACK_MIMETYPE })
+
+    assert response.mimetype == index.MSGPACK_MIMETYPE
+    assert msgpack.unpackb(response.data) == { 'name': 'Alpha', 'price': 10.5 }
+
+def test_brotli_response(client, fake_sources, monkeypatch):
+    brotli = pytest.importorskip('brotli')
+    monkeypatch.setattr(index, 'COMPRESSION_MIN_SIZE', 0)
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+
+    response = client.get('/stock/AAA?info_names=name', headers={ 'Accept-Encoding': 'br, gzip' })
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == b'{"name":"Alpha"}'
+
+@pytest.mark.parametrize('encoding', [ 'br', 'gzip' ])
+def test_ndjson_stream_is_compressed_incrementally(client, fake_sources, encoding):
+    decompress = pytest.importorskip('brotli').decompress if encoding == 'br' else gzip.decompress
+    data_by_ticker, _ = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+    data_by_ticker['BBB'] = { 'name': 'Beta' }
+
+    response = client.get('/stock/AAA,BBB?info_names=name', headers={ 'Accept': index.NDJSON_MIMETYPE, 'Accept-Encoding': encoding }, buffered=False)
+    chunks = [ chunk for chunk in response.response if chunk ]
+    body = decompress(b''.join(chunks))
+
+    assert response.headers['Content-Encoding'] == encoding
+    assert len(chunks) >= 2
+    assert body.decode().splitlines() == [ '{"ticker":"AAA","data":{"name":"Alpha"}}', '{"ticker":"BBB","data":{"name":"Beta"}}' ]
+
+@pytest.mark.parametrize('tickers', [ ',', 'AAA,', 'AAA,<script>' ])
+def test_invalid_tickers_are_rejected(client, fake_sources, tickers):
+    response = client.get(f'/stock/{tickers}')
+
+    assert response.status_code == 400
+
+def test_ticker_list_is_capped(client, fake_sources, monkeypatch):
+    monkeypatch.setattr(index, 'MAX_TICKERS_PER_REQUEST', 2)
+
+    response = client.get('/stock/AAA,BBB,CCC')
+
+    assert response.status_code == 400
+
+def test_duplicated_tickers_are_fetched_once(client, fake_sources):
+    data_by_ticker, calls = fake_sources
+    data_by_ticker['AAA'] = { 'name': 'Alpha' }
+
+    response = client.get('/stock/AAA,aaa,BBB?info_names=name&should_use_cache=0')
+
+    assert list(response.get_json()) == [ 'AAA', 'BBB' ]
+    assert [ ticker for ticker, _ in calls ] == [ 'AAA', 'BBB' ]
@@ -0,0 +1,128 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import post_crawl
+
+import index
+
+@pytest.fixture
+def crawled_reits(client, stockanalysis_stand_in):
+    response = post_crawl(client, '/crawl/reit?source=stockanalysis', json={ 'tickers': [ 'aaa', 'bbb', 'ccc', 'zzz' ] })
+    assert response.status_code == 200
+    return response.get_json()
+
+def screen(client, query):
+    response = client.get(f'/screen/reit?{query}')
+    return response.status_code, response.get_json()
+
+def test_crawl_reports_crawled_and_missing_tickers(crawled_reits):
+    assert crawled_reits == { 'crawled': 3, 'missing_tickers': [ 'ZZZ' ], 'snapshot_tickers': 3 }
+
+def test_screen_filters_sorts_and_projects(client, crawled_reits):
+    status, data = screen(client, 'filters=dy>5;roe>5&sort_by=-dy&info_names=dy,name')
+
+    assert status == 200
+    assert data == [
+        { 'ticker': 'AAA', 'dy': 8.5, 'name': 'Alpha Realty' },
+        { 'ticker': 'CCC', 'dy': 6.5, 'name': 'Gamma Storage' }
+    ]
+
+def test_screen_accepts_comma_decimals(client, crawled_reits):
+    _, data = screen(client, 'filters=dy>6,5&info_names=dy')
+
+    assert data == [ { 'ticker': 'AAA', 'dy': 8.5 } ]
+
+def test_unparseable_source_values_are_missing_not_zero(client, crawled_reits):
+    _, data = screen(client, 'filters=price=0&info_names=price')
+    assert data == []
+
+    _, data = screen(client, 'sort_by=price&info_names=price')
+    assert data[-1] == { 'ticker': 'CCC', 'price': None }
+
+def test_screen_filters_text_infos(client, crawled_reits):
+    _, data = screen(client, 'filters=actuation=reit-office&info_names=name')
+
+    assert data == [ { 'ticker': 'BBB', 'name': 'Beta Properties' } ]
+
+@pytest.mark.parametrize('query', [
+    'filters=dy>abc',
+    'filters=unknown>1',
+    'info_names=latests_dividends',
+    'sort_by=latests_dividends',
+    'limit=abc'
+])
+def test_screen_rejects_invalid_queries(client, crawled_reits, query):
+    status, data = screen(client, query)
+
+    assert status == 400
+    assert 'error' in data
+
+def test_crawl_merges_batches_into_snapshot(client, stockanalysis_stand_in):
+    post_crawl(client, '/crawl/reit?source=stockanalysis', json=[ 'AAA' ])
+    response = post_crawl(client, '/crawl/reit?source=stockanalysis', data='BBB\nCCC')
+
+    assert response.get_json()['snapshot_tickers'] == 3
+
+    response = post_crawl(client, '/crawl/reit?source=stockanalysis&should_replace_snapshot=1', json=[ 'BBB' ])
+
+    assert response.get_json()['snapshot_tickers'] == 1
+
+def test_crawl_rejects_oversized_batches(client, monkeypatch):
+    monkeypatch.setattr(index, 'SNAPSHOT_CRAWL_MAX_TICKERS', 2)
+
+    response = post_crawl(client, '/crawl/reit', json=[ 'AAA', 'BBB', 'CCC' ])
+
+    assert response.status_code == 413
+
+def test_snapshot_swap_keeps_previous_version_readable(client, crawled_reits):
+    old_version_path = os.path.realpath(index.get_snapshot_link('reit'))
+
+    post_crawl(client, '/crawl/reit?source=stockanalysis&should_replace_snapshot=1', json=[ 'AAA' ])
+
+    assert os.path.realpath(index.get_snapshot_link('reit')) != old_version_path
+    assert os.path.isdir(old_version_path)
+
+def test_screen_without_snapshot_returns_not_found(client):
+    status, _ = screen(client, 'filters=dy>5')
+
+    assert status == 404
+
+def test_snapshot_is_shared_through_remote_cache(client, stockanalysis_stand_in, monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    monkeypatch.setattr(index, 'CACHE_REDIS_URL', 'redis://stand-in')
+    monkeypatch.setitem(index.REMOTE_CACHE, 'client', fakeredis.FakeRedis())
+
+    post_crawl(client, '/crawl/reit?source=stockanalysis', json=[ 'AAA', 'BBB' ])
+
+    shutil.rmtree(index.SNAPSHOT_DIR)
+    index.SNAPSHOTS.clear()
+
+    status, data = screen(client, 'filters=dy>5&info_names=dy')
+
+    assert status == 200
+    assert data == [ { 'ticker': 'AAA', 'dy': 8.5 } ]
+
+def test_infos_missing_from_page_are_missing_not_zero(client, crawled_reits):
+    _, data = screen(client, 'info_names=roic,avg_price,variation_12m')
+
+    assert all(row == { 'ticker': row['ticker'], 'roic': None, 'avg_price': None, 'variation_12m': None } for row in data)
+
+    _, data = screen(client, 'filters=roic<1')
+
+    assert data == []
+
+def test_share_route_keeps_zero_for_missing_numbers(client, stockanalysis_stand_in):
+    response = client.get('/reit/AAA?source=stockanalysis&info_names=roic,roe&should_use_cache=0')
+
+    assert response.get_json() == { 'roic': 0, 'roe': 12.0 }
+
+def test_crawl_requires_token(client, monkeypatch):
+    response = client.post('/crawl/reit', json=[ 'AAA' ], headers={ 'Authorization': 'Bearer wrong' })
+    assert response.status_code == 401
+
+    monkeypatch.setattr(index, 'SNAPSHOT_CRAWL_TOKEN', None)
+
+    response = post_crawl(client, '/crawl/reit', json=[ 'AAA' ])
+    assert response.status_code == 404